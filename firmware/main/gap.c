@@ -54,6 +54,26 @@ void sync_cb(void) {
   advertise();
 }
 
+// ask the central for a short connection interval so drive commands
+// go out on the next connection event instead of waiting 30-50 ms
+static void request_fast_conn_params(uint16_t conn_handle) {
+  struct ble_gap_upd_params params;
+  int rc;
+
+  memset(&params, 0, sizeof(params));
+  params.itvl_min = 6;   // 7.5 ms, units of 1.25 ms
+  params.itvl_max = 12;  // 15 ms
+  params.latency = 0;
+  params.supervision_timeout = BLE_GAP_INITIAL_SUPERVISION_TIMEOUT;
+  params.min_ce_len = BLE_GAP_INITIAL_CONN_MIN_CE_LEN;
+  params.max_ce_len = BLE_GAP_INITIAL_CONN_MAX_CE_LEN;
+
+  rc = ble_gap_update_params(conn_handle, &params);
+  if (rc != 0) {
+    ESP_LOGW(LOG_TAG_GAP, "Error requesting connection params: rc=%d", rc);
+  }
+}
+
 int gap_event_handler(struct ble_gap_event *event, void *arg) {
   switch (event->type) {
     case BLE_GAP_EVENT_CONNECT:
@@ -66,6 +86,10 @@ int gap_event_handler(struct ble_gap_event *event, void *arg) {
       set_led(3,true);
       set_led(2,true);
 
+      if (event->connect.status == 0) {
+        request_fast_conn_params(event->connect.conn_handle);
+      }
+
       break;
 
     case BLE_GAP_EVENT_DISCONNECT:
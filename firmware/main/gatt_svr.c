@@ -74,7 +74,7 @@ static const struct ble_gatt_svc_def gatt_svr_svcs[] = {
                                 // characteristic: OTA data
                                 .uuid = &gatt_svr_chr_ota_data_uuid.u,
                                 .access_cb = gatt_svr_chr_ota_data_cb,
-                                .flags = BLE_GATT_CHR_F_WRITE,
+                                .flags = BLE_GATT_CHR_F_WRITE | BLE_GATT_CHR_F_WRITE_NO_RSP,
                                 .val_handle = &ota_data_val_handle,
                         },
                         {
@@ -0,0 +1,17 @@
+"""
+Shared code for the MicroRacer controller scripts.
+
+ble holds the car connection and command protocol; each input_* module is
+one way of driving it (DualSense via pygame, readchar, keyboard).
+"""
+import asyncio
+
+
+def run(main):
+    """Run the main() coroutine, on uvloop where it is available."""
+    try:
+        import uvloop  # lower per-iteration event loop overhead
+    except ImportError:  # not available on Windows
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -0,0 +1,400 @@
+"""
+BLE link to the car: device selection, connection setup and motor commands.
+
+Shared by all controller scripts; only one car connection is open at a time,
+so the write path chosen while connecting is kept at module level.
+"""
+import asyncio
+import functools
+import json
+import os
+import threading
+from bleak import BleakClient, BleakScanner
+
+from racer.console import console
+
+CONFIG_FILE = "ble_device_config.json"
+CHARACTERISTIC_UUID = "23408888-1f40-4cd8-9b89-ca8d45f8a5b0"
+DEVICE_NAME_PREFIX = "Racer"  # Advertised name of the car, see firmware/main/gap.h
+CAR_SCAN_TIMEOUT = 5.0  # Stops early as soon as a car is heard
+SCAN_TIMEOUT = 2.0
+
+# Longest connection interval the car firmware asks for after connecting,
+# in units of 1.25 ms (7.5-15 ms, see request_fast_conn_params in gap.c)
+CONN_MAX_INTERVAL = 12
+SEND_INTERVAL = CONN_MAX_INTERVAL * 1.25 / 1000  # one connection event, in seconds
+
+SHUTDOWN_TIMEOUT = 1.0  # Max wait for the final stop command and the disconnect
+STOP_COMMAND = (0, 1, 0, 1, 1)
+
+# Cleared after connecting if the car firmware only accepts acknowledged writes
+write_without_response = True
+# Reused for every command; send_command is only ever awaited from one task
+command_buffer = bytearray(5)
+# BlueZ AcquireWrite socket, set after connecting when available
+command_socket = None
+# Set while the socket is released for an acknowledged write
+command_socket_released = False
+
+async def send_command(client, speedA, directionA, speedB, directionB, duration, response=False):
+    """
+    Send motor command to car via BLE.
+
+    Commands go out as write-without-response so the loop doesn't wait for an
+    ATT acknowledgement on every packet. Pass response=True for commands that
+    must be delivered (e.g. emergency stop).
+    """
+    command = command_buffer
+    command[0] = speedA
+    command[1] = directionA
+    command[2] = speedB
+    command[3] = directionB
+    command[4] = duration
+    if command_socket_released and not response:
+        await reacquire_command_socket(client)
+    if command_socket is not None:
+        if not response:
+            command_socket.write(command)
+            return
+        await send_acknowledged(client, command)
+        return
+    await client.write_gatt_char(CHARACTERISTIC_UUID, command,
+                                 response=response or not write_without_response)
+
+async def send_acknowledged(client, command):
+    """
+    Send an acknowledged write while the command socket is acquired.
+
+    BlueZ rejects WriteValue with NotPermitted while the write is acquired,
+    so the socket is released for the write. It is only acquired again by
+    the next drive command: after the final stop there is none, and a
+    cancelled or failed write doesn't wait on another D-Bus call.
+    Closing it also drops any stale drive command still waiting on it.
+    """
+    global command_socket, command_socket_released
+
+    command_socket.close()
+    command_socket = None
+    command_socket_released = True
+    await client.write_gatt_char(CHARACTERISTIC_UUID, command, response=True)
+
+async def reacquire_command_socket(client):
+    """Acquire the command socket again after send_acknowledged released it."""
+    global command_socket, command_socket_released
+
+    command_socket_released = False  # If unavailable now, keep using D-Bus writes
+    command_socket = await CommandSocket.acquire(client)
+
+def check_write_without_response(client):
+    """Check once whether the car's command characteristic accepts write-without-response."""
+    global write_without_response
+    characteristic = client.services.get_characteristic(CHARACTERISTIC_UUID)
+    write_without_response = (characteristic is not None
+                              and "write-without-response" in characteristic.properties)
+    if not write_without_response:
+        console.print("[yellow]Car firmware does not support write-without-response, "
+                      "using acknowledged writes[/yellow]")
+
+async def negotiate_mtu(client):
+    """
+    Exchange the ATT MTU once, right after connecting.
+
+    On BlueZ the MTU is otherwise only known after the first acquired write,
+    so the first drive command would pay for the exchange. Not needed when
+    the command socket is acquired, its reply already carries the MTU.
+    """
+    backend = getattr(client, "_backend", None)
+    if hasattr(backend, "_acquire_mtu") and command_socket is None:  # BlueZ only
+        try:
+            await backend._acquire_mtu()
+        except Exception:
+            pass  # keep the default 23-byte MTU
+    console.print(f"[dim]ATT MTU: {client.mtu_size}[/dim]")
+
+class CommandSocket:
+    """
+    BlueZ AcquireWrite socket for write-without-response commands.
+
+    Writes go straight to the socket instead of through D-Bus. When the
+    controller's buffer is full the socket isn't writable; rather than
+    queueing behind it, only the newest command is kept and written as soon
+    as the socket becomes writable again.
+    """
+
+    def __init__(self, fd):
+        self.fd = fd
+        self.pending = None
+        os.set_blocking(fd, False)
+
+    @classmethod
+    async def acquire(cls, client):
+        """Acquire the command characteristic's write socket, or return None if unavailable."""
+        backend = getattr(client, "_backend", None)
+        bus = getattr(backend, "_bus", None)
+        if bus is None or not write_without_response:  # BlueZ only
+            return None
+
+        from dbus_fast import Message, MessageType
+
+        characteristic = client.services.get_characteristic(CHARACTERISTIC_UUID)
+        reply = await bus.call(
+            Message(
+                destination="org.bluez",
+                path=characteristic.obj[0],
+                interface="org.bluez.GattCharacteristic1",
+                member="AcquireWrite",
+                signature="a{sv}",
+                body=[{}],
+            )
+        )
+        if reply is None or reply.message_type == MessageType.ERROR:
+            return None
+        # The reply is (fd, mtu); record the MTU the way bleak's _acquire_mtu does
+        backend._mtu_size = reply.body[1]
+        return cls(reply.unix_fds[0])
+
+    def write(self, command):
+        if self.pending is not None:
+            # Still waiting for the socket; the newer command replaces the stale one
+            self.pending = bytes(command)
+            return
+        try:
+            os.write(self.fd, command)
+        except BlockingIOError:
+            self.pending = bytes(command)
+            asyncio.get_running_loop().add_writer(self.fd, self._flush)
+
+    def discard_pending(self):
+        if self.pending is not None:
+            asyncio.get_running_loop().remove_writer(self.fd)
+            self.pending = None
+
+    def _flush(self):
+        try:
+            os.write(self.fd, self.pending)
+        except BlockingIOError:
+            return  # Still full, wait for the next writable event
+        except OSError:
+            pass  # Connection is gone; the next write raises
+        self.discard_pending()
+
+    def close(self):
+        self.discard_pending()
+        os.close(self.fd)
+
+async def input_async(prompt):
+    """
+    Run input() on a daemon thread so it doesn't block the event loop.
+
+    Not the default executor: Ctrl+C at the prompt would then wait for its
+    worker thread, i.e. for another Enter, before the process could exit.
+    """
+    loop = asyncio.get_running_loop()
+    answer = loop.create_future()
+
+    def set_answer(result, error):
+        if answer.done():
+            return  # Cancelled meanwhile
+        if error is not None:
+            answer.set_exception(error)
+        else:
+            answer.set_result(result)
+
+    def read_answer():
+        try:
+            result, error = input(prompt), None
+        except Exception as e:  # e.g. EOFError
+            result, error = None, e
+        try:
+            loop.call_soon_threadsafe(set_answer, result, error)
+        except RuntimeError:
+            pass  # Event loop already closed
+
+    threading.Thread(target=read_answer, daemon=True).start()
+    return await answer
+
+def is_car(device, advertisement_data):
+    """Scanner filter matching the car's advertised name."""
+    name = advertisement_data.local_name or device.name or ""
+    return name.startswith(DEVICE_NAME_PREFIX)
+
+async def select_device(auto_pick=True):
+    """
+    Scan for and select a BLE device.
+
+    With auto_pick, the first car heard is used without asking. Pass False
+    when the user just declined a saved device, so they get to choose.
+    Either way the devices heard during the scan are listed if no car is
+    picked, without scanning a second time.
+    """
+    timeout = CAR_SCAN_TIMEOUT if auto_pick else SCAN_TIMEOUT
+    async with BleakScanner() as scanner:
+        try:
+            async with asyncio.timeout(timeout):
+                async for device, advertisement_data in scanner.advertisement_data():
+                    if auto_pick and is_car(device, advertisement_data):
+                        console.print(f"[green]Found car: {device.name} - {device.address}[/green]")
+                        return device.address
+        except TimeoutError:
+            pass
+        # Let the user pick from everything heard
+        devices = scanner.discovered_devices
+
+    if not devices:
+        console.print("[red]No BLE devices found.[/red]")
+        return None
+
+    console.print("[bold]Available BLE devices:[/bold]")
+    for i, device in enumerate(devices):
+        console.print(f"{i}: {device.name} - {device.address}")
+
+    while True:
+        try:
+            selection = int(await input_async("Select device by number: "))
+            if 0 <= selection < len(devices):
+                return devices[selection].address
+            else:
+                console.print("[yellow]Invalid selection. Please try again.[/yellow]")
+        except ValueError:
+            console.print("[yellow]Please enter a valid number.[/yellow]")
+
+@functools.lru_cache(maxsize=1)
+def _read_config(mtime):
+    with open(CONFIG_FILE, "r") as f:
+        return json.load(f)
+
+def load_config():
+    """Load saved BLE device address."""
+    try:
+        mtime = os.stat(CONFIG_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    # Cached per modification time; copied since callers update it
+    return dict(_read_config(mtime))
+
+def save_config(config):
+    """Save BLE device address."""
+    # Write to a temp file and rename it over the config, so an interrupted
+    # save can't leave a truncated file behind
+    tmp_file = CONFIG_FILE + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(config, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, CONFIG_FILE)
+
+async def get_ble_address(confirm_saved=False):
+    """
+    Get BLE address from config or user selection.
+
+    With confirm_saved, the user is asked before reusing the saved device.
+    """
+    config = load_config()
+    saved_address = config.get("ble_address")
+
+    if saved_address and not confirm_saved:
+        console.print(f"[cyan]Using saved device: {saved_address}[/cyan]")
+        console.print(f"[dim](Delete {CONFIG_FILE} to select a different device)[/dim]\n")
+        return saved_address
+
+    if saved_address:
+        console.print(f"[cyan]Previously connected to device: {saved_address}[/cyan]")
+        choice = (await input_async("Connect to the same device? (y/n): ")).lower()
+        if choice == 'y':
+            return saved_address
+
+    # Only pick a car automatically on first use, not after the saved one was declined
+    new_address = await select_device(auto_pick=not saved_address)
+    if new_address:
+        config["ble_address"] = new_address
+        save_config(config)
+    return new_address
+
+def put_latest(queue, item):
+    """Put item on a maxsize=1 queue, replacing whatever is still pending."""
+    try:
+        queue.put_nowait(item)
+    except asyncio.QueueFull:
+        queue.get_nowait()
+        queue.task_done()
+        queue.put_nowait(item)
+
+def queue_command(commands, command, response=False):
+    """
+    Queue a command for send_commands, replacing a pending one.
+
+    A pending acknowledged command (the stop) is never replaced by a
+    write-without-response drive command; the drive command is dropped and
+    the next keepalive sends it again.
+    """
+    try:
+        pending = commands.get_nowait()
+    except asyncio.QueueEmpty:
+        pass
+    else:
+        commands.task_done()
+        if pending[1] and not response:
+            command, response = pending
+    commands.put_nowait((command, response))
+
+async def send_commands(client, commands):
+    """
+    Write queued (command, response) pairs to the car.
+
+    Runs as its own task so a slow BLE write never holds up controller
+    polling; while a write is in flight only the latest command waits.
+    """
+    while True:
+        command, response = await commands.get()
+        try:
+            await send_command(client, *command, response=response)
+        finally:
+            commands.task_done()
+
+async def connect(ble_address):
+    """Connect to the car and set up the fastest write path it supports."""
+    global command_socket
+
+    console.print(f"[cyan]Connecting to car: {ble_address}[/cyan]")
+
+    client = BleakClient(ble_address)
+    await client.connect()
+    console.print(f"[green]Connected: {client.is_connected}[/green]\n")
+    try:
+        check_write_without_response(client)
+        command_socket = await CommandSocket.acquire(client)
+        await negotiate_mtu(client)
+    except BaseException:
+        await disconnect(client)
+        raise
+    return client
+
+async def disconnect(client):
+    """Close the command socket and disconnect, giving BlueZ at most SHUTDOWN_TIMEOUT."""
+    global command_socket, command_socket_released
+
+    if command_socket is not None:
+        command_socket.close()
+        command_socket = None
+    command_socket_released = False
+    try:
+        await asyncio.wait_for(client.disconnect(), timeout=SHUTDOWN_TIMEOUT)
+    except TimeoutError:
+        pass  # The disconnect request is already on its way to BlueZ
+
+async def drive(control_loop, confirm_saved=False):
+    """
+    Pick the car, connect, and run control_loop(client) until it returns.
+
+    The connection is always closed afterwards, within SHUTDOWN_TIMEOUT.
+    """
+    ble_address = await get_ble_address(confirm_saved)
+    if not ble_address:
+        console.print("[red]No device selected. Exiting.[/red]")
+        return
+
+    client = await connect(ble_address)
+    try:
+        await control_loop(client)
+    finally:
+        await disconnect(client)
@@ -0,0 +1,12 @@
+"""Rich console shared by the controller scripts."""
+from rich.console import Console
+
+console = Console()
+
+def print_error(error):
+    """Print an error, unpacking the ExceptionGroup a TaskGroup wraps it in."""
+    if isinstance(error, BaseExceptionGroup):
+        for sub_error in error.exceptions:
+            print_error(sub_error)
+    else:
+        console.print(f"[red]Error: {error}[/red]")
@@ -0,0 +1,42 @@
+"""
+Keyboard input for the car, polled with the keyboard module.
+
+Commands repeat for as long as a key is held. Needs root on Linux.
+W=Forward, S=Backward, A=Left, D=Right, Q=Quit.
+"""
+import asyncio
+import keyboard
+
+from racer import ble
+from racer.console import console
+
+
+async def handle_key_press(client):
+
+    # motor A speed, motor A dir, motor B speed, motor B dir, time 50 == 5.0 seconds
+    if keyboard.is_pressed('w'):
+        await ble.send_command(client, 60,1,60,1,5)
+        console.print("Forward")
+    elif keyboard.is_pressed('s'):
+        await ble.send_command(client, 50,0,50,0,5)
+        console.print("Backwards")
+    elif keyboard.is_pressed('d'):
+        await ble.send_command(client, 40,1,40,0,3)
+        console.print("Right")
+    elif keyboard.is_pressed('a'):
+        await ble.send_command(client, 40,0,40,1,3)
+        console.print("Left")
+
+async def control_loop(client):
+    console.print("Press 'w' to speed up, 's' to slow down, or 'q' to quit.")
+
+    while True:
+        await handle_key_press(client)
+        if keyboard.is_pressed('q'):
+            console.print("Quitting...")
+            break
+        # Writes don't wait for an acknowledgement, so pace them explicitly
+        await asyncio.sleep(ble.SEND_INTERVAL)
+
+async def main():
+    await ble.drive(control_loop, confirm_saved=True)
@@ -0,0 +1,406 @@
+"""
+DualSense (or any pygame joystick) input for the car.
+
+L3 drives with the Thumbtroller tank mixing, the D-pad changes the speed
+limit, X is an emergency stop and Circle quits.
+"""
+import asyncio
+import math
+import queue
+import sys
+import threading
+import time
+from dataclasses import dataclass
+import pygame
+from rich.live import Live
+from rich.table import Table
+from rich.text import Span, Text
+
+from racer import ble
+from racer.console import console, print_error
+
+# Configuration
+DEADZONE = 0.10  # Ignore stick movements below 10%
+MAX_SPEED = 50   # Maximum base speed (matches Thumbtroller)
+MAX_MIXER = 30   # Maximum turn strength
+MAX_SPEED_LEVELS = [50, 75, 100]  # Speed limit modes
+CONTROL_PERIOD = 0.05  # 20Hz
+KEEPALIVE_INTERVAL = 0.5  # Resend an unchanged command at least this often
+PUMP_PERIOD = 1 / 60  # Controller sampling rate of the event pump thread
+# Lookup table bins per unit of stick travel. DEADZONE must be a multiple of
+# 1 / STICK_STEPS, so the deadzone edge falls on a bin edge.
+STICK_STEPS = 40
+
+def calculate_motor_command(left_stick_x, left_stick_y, max_speed_limit):
+    """
+    Tank drive mixing - replicates Thumbtroller remote logic.
+
+    This uses the same algorithm as the original hardware remote:
+    - Y-axis controls forward/backward speed
+    - X-axis controls turning (mixer)
+    - Tank drive: left = speed + mixer, right = speed - mixer
+
+    Args:
+        left_stick_x: -1.0 (left) to +1.0 (right)
+        left_stick_y: -1.0 (up/forward) to +1.0 (down/backward)
+        max_speed_limit: Speed multiplier (50, 75, or 100)
+
+    Returns:
+        (speedA, dirA, speedB, dirB, duration)
+    """
+    # Apply deadzone
+    if abs(left_stick_x) < DEADZONE:
+        left_stick_x = 0.0
+    if abs(left_stick_y) < DEADZONE:
+        left_stick_y = 0.0
+
+    # Stop if centered
+    if left_stick_x == 0 and left_stick_y == 0:
+        return ble.STOP_COMMAND
+
+    scale = max_speed_limit / 100.0
+
+    # Map joystick to speed and mixer
+    # Y-axis: -1 (forward) to +1 (backward) → -MAX_SPEED to +MAX_SPEED
+    # X-axis: -1 (left) to +1 (right) → -MAX_MIXER to +MAX_MIXER
+    speed = int(-left_stick_y * MAX_SPEED * scale)
+    mixer = int(left_stick_x * MAX_MIXER * scale)
+
+    # Thumbtroller logic: add extra juice for pure turning (no forward/backward).
+    # The stick is off-center here, so y == 0 implies a nonzero x and mixer.
+    mixer += int(math.copysign(25, mixer)) * (left_stick_y == 0)
+
+    # Tank drive mixing (Thumbtroller algorithm)
+    speed_a = speed + mixer  # Left wheel
+    speed_b = speed - mixer  # Right wheel
+
+    # Speed is the clamped magnitude, direction comes from the sign
+    return (min(100, abs(speed_a)), int(speed_a >= 0),
+            min(100, abs(speed_b)), int(speed_b >= 0), 2)
+
+def build_motor_command_tables():
+    """
+    Precompute calculate_motor_command on a grid of stick positions.
+
+    Returns one table per MAX_SPEED_LEVELS entry, indexed [x_bin][y_bin],
+    so the control loop only does a lookup per tick. Each bin covers
+    1 / STICK_STEPS of stick travel and is computed at its center; since
+    bins don't straddle the deadzone edge, the deadzone is kept exactly.
+    The outer bins are computed at full deflection instead, so full stick
+    still reaches each level's top speed.
+    """
+    positions = [(i + 0.5) / STICK_STEPS - 1.0 for i in range(2 * STICK_STEPS)]
+    positions[0], positions[-1] = -1.0, 1.0
+    return [[[calculate_motor_command(x, y, max_speed_limit) for y in positions]
+             for x in positions]
+            for max_speed_limit in MAX_SPEED_LEVELS]
+
+MOTOR_COMMAND_TABLES = build_motor_command_tables()
+LAST_STICK_BIN = 2 * STICK_STEPS - 1  # Full deflection (+1.0) goes in the last bin
+
+def lookup_motor_command(left_stick_x, left_stick_y, max_speed_index):
+    """Look up the motor command precomputed for the bin the stick position falls in."""
+    x_bin = min(int((left_stick_x + 1.0) * STICK_STEPS), LAST_STICK_BIN)
+    y_bin = min(int((left_stick_y + 1.0) * STICK_STEPS), LAST_STICK_BIN)
+    return MOTOR_COMMAND_TABLES[max_speed_index][x_bin][y_bin]
+
+def keepalive_interval(command):
+    """
+    How long an unchanged command can go without being resent.
+
+    The car stops on its own once a command's duration (in 100 ms units)
+    runs out, so a moving command is refreshed one control period before
+    that; a stop command only needs the occasional keepalive.
+    """
+    if command[0] == 0 and command[2] == 0:
+        return KEEPALIVE_INTERVAL
+    return min(KEEPALIVE_INTERVAL, command[4] / 10.0 - CONTROL_PERIOD)
+
+@dataclass(frozen=True)
+class StatusSnapshot:
+    """What the status display shows; compared to skip redundant redraws."""
+    left_x: float
+    left_y: float
+    max_speed: int
+    command: tuple
+    emergency_stop: bool = False
+
+class StatusDisplay:
+    """
+    Live status table, rendered from a background thread.
+
+    Terminal writes can block (e.g. over SSH), so the control loop only
+    hands over snapshots with show() and never waits on rendering. The
+    table is built once; rendering updates its cells in place.
+
+    While the display is open, all console output goes through print(), so
+    the render thread is the only one touching the cells or the terminal.
+    """
+
+    def __init__(self):
+        self.position_text = Text(style="yellow")
+        self.max_speed_text = Text()
+        self.motor_a_text = Text(style="magenta")
+        self.motor_b_text = Text(style="magenta")
+        self.status_text = Text()
+
+        self.table = Table(show_header=False, box=None)
+        self.table.add_column("Label", style="cyan")
+        self.table.add_column("Value")
+        self.table.add_row("L3 Position", self.position_text)
+        self.table.add_row("Max Speed", self.max_speed_text)
+        self.table.add_row("Motor A", self.motor_a_text)
+        self.table.add_row("Motor B", self.motor_b_text)
+        self.table.add_row("Status", self.status_text)
+        self.table.add_row("", Text("X=Stop | Circle=Quit", style="dim"))
+
+        self.live = Live(self.table, console=console, auto_refresh=False)
+        # Snapshots and messages in order; None stops the render thread
+        self.updates = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self.live.__enter__()
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.updates.put(None)  # Stop the render thread
+        self.thread.join()
+        return self.live.__exit__(*exc_info)
+
+    def show(self, snapshot):
+        """Hand a snapshot to the render thread; only the newest one queued is drawn."""
+        self.updates.put(snapshot)
+
+    def print(self, message):
+        """Print a message above the table from the render thread."""
+        self.updates.put(message)
+
+    def _run(self):
+        while True:
+            # Take everything queued while the last refresh was blocked
+            updates = [self.updates.get()]
+            while not self.updates.empty():
+                updates.append(self.updates.get())
+
+            snapshot = None
+            for update in updates:
+                if update is None:
+                    return
+                if isinstance(update, StatusSnapshot):
+                    snapshot = update
+                else:
+                    self.live.console.print(update)
+            if snapshot is not None:
+                self._render(snapshot)
+                self.live.refresh()
+
+    def _render(self, snapshot):
+        self.position_text.plain = f"({snapshot.left_x:+.2f}, {snapshot.left_y:+.2f})"
+        max_speed_label = f"{snapshot.max_speed}%"
+        self.max_speed_text.plain = f"{max_speed_label} (D-pad ↑/↓ to adjust)"
+        self.max_speed_text.spans = [Span(0, len(max_speed_label), "green")]
+
+        # Motor command
+        speedA, dirA, speedB, dirB, duration = snapshot.command
+        dir_str_a = "FWD" if dirA == 1 else "BWD"
+        dir_str_b = "FWD" if dirB == 1 else "BWD"
+        self.motor_a_text.plain = f"{speedA}% {dir_str_a}"
+        self.motor_b_text.plain = f"{speedB}% {dir_str_b}"
+
+        # Status
+        if snapshot.emergency_stop:
+            self.status_text.plain, self.status_text.style = "EMERGENCY STOP", "red bold"
+        elif speedA == 0 and speedB == 0:
+            self.status_text.plain, self.status_text.style = "Stopped", "dim"
+        else:
+            self.status_text.plain, self.status_text.style = "Running", "green"
+
+class ControllerReader:
+    """
+    Pumps pygame events and samples the controller from a background thread.
+
+    The control loop gets the latest sample from read() without any SDL calls
+    of its own. SDL on macOS only pumps events on the main thread, so there
+    read() samples inline instead.
+    """
+
+    def __init__(self, joystick):
+        self.joystick = joystick
+        # Bound once instead of resolving these every sample
+        self.pump = pygame.event.pump
+        self.get_axis = joystick.get_axis
+        self.get_button = joystick.get_button
+        self.get_hat = joystick.get_hat
+        self.has_hat = joystick.get_numhats() > 0
+        self.threaded = sys.platform != "darwin"
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self._sample()
+
+    def __enter__(self):
+        if self.threaded:
+            self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.threaded:
+            self.stopped.set()
+            self.thread.join()
+
+    def read(self):
+        """Return (left_x, left_y, button_x, button_circle, dpad)."""
+        if not self.threaded:
+            self._sample()
+        return self.state
+
+    def _run(self):
+        while not self.stopped.wait(PUMP_PERIOD):
+            self._sample()
+
+    def _sample(self):
+        get_axis = self.get_axis
+        get_button = self.get_button
+        self.pump()
+        # Rebinding a tuple is atomic, so readers never see a torn sample
+        self.state = (
+            get_axis(0),  # L3 X-axis
+            get_axis(1),  # L3 Y-axis
+            get_button(0),  # X = emergency stop
+            get_button(1),  # Circle = quit
+            self.get_hat(0) if self.has_hat else (0, 0),  # D-pad
+        )
+
+async def poll_controller(controller, commands, display, quit_event):
+    """Poll the controller at 20Hz and queue commands until quit is pressed."""
+    max_speed_index = 2  # Start at 100%
+    last_dpad_state = (0, 0)
+    emergency_stop_active = False
+    last_command = None
+    last_send_time = 0.0
+    last_snapshot = None
+
+    # Bind hot-path lookups to locals once instead of resolving them every tick
+    read_controller = controller.read
+    monotonic = time.monotonic
+    sleep = asyncio.sleep
+    max_speed_levels = MAX_SPEED_LEVELS
+
+    next_deadline = monotonic()
+    while True:
+        # Pace on a fixed monotonic deadline so the time spent polling
+        # doesn't drag the loop below 20Hz
+        next_deadline += CONTROL_PERIOD
+        delay = next_deadline - monotonic()
+        if delay < -CONTROL_PERIOD:
+            # More than one period behind: resync instead of bursting
+            next_deadline = monotonic()
+        await sleep(max(0, delay))
+
+        # Latest controller state, sampled by the event pump thread
+        left_x, left_y, button_x, button_circle, dpad = read_controller()
+
+        # Handle quit; control_loop takes care of stopping the car
+        if button_circle:
+            display.print("\n[yellow]Circle pressed - Quitting...[/yellow]")
+            quit_event.set()
+            return
+
+        # Handle emergency stop
+        if button_x:
+            if not emergency_stop_active:
+                emergency_stop_active = True
+                # Replaces any pending command so the stop goes out next
+                ble.queue_command(commands, ble.STOP_COMMAND, response=True)
+                last_command = ble.STOP_COMMAND
+                last_send_time = next_deadline
+                last_snapshot = StatusSnapshot(round(left_x, 2), round(left_y, 2),
+                                               max_speed_levels[max_speed_index],
+                                               ble.STOP_COMMAND, emergency_stop=True)
+                display.show(last_snapshot)
+            continue
+        else:
+            emergency_stop_active = False
+
+        # Handle D-pad speed adjustment (detect rising edge)
+        if dpad != last_dpad_state:
+            if dpad[1] == 1:  # D-pad up
+                max_speed_index = min(len(max_speed_levels) - 1, max_speed_index + 1)
+            elif dpad[1] == -1:  # D-pad down
+                max_speed_index = max(0, max_speed_index - 1)
+        last_dpad_state = dpad
+
+        max_speed = max_speed_levels[max_speed_index]
+
+        # Look up command precomputed with the Thumbtroller algorithm
+        command = lookup_motor_command(left_x, left_y, max_speed_index)
+
+        # Send to car, skipping unchanged commands until the keepalive is due.
+        # Timed on the tick deadlines, not monotonic(): a tick waking a few
+        # microseconds early would otherwise push the resend a whole period
+        # late. Half a period of slack absorbs float error in the deadlines.
+        if (command != last_command
+                or next_deadline - last_send_time >= keepalive_interval(command) - CONTROL_PERIOD / 2):
+            ble.queue_command(commands, command)
+            last_command = command
+            last_send_time = next_deadline
+
+        # Only redraw the status display when something on it changed
+        snapshot = StatusSnapshot(round(left_x, 2), round(left_y, 2), max_speed, command)
+        if snapshot != last_snapshot:
+            display.show(snapshot)
+            last_snapshot = snapshot
+
+async def control_loop(client, joystick):
+    """Main control loop - read controller and send commands to car."""
+    console.print("[bold]Controls:[/bold]")
+    console.print("  L3 Up/Down: Forward/Backward")
+    console.print("  L3 Left/Right: Steering")
+    console.print("  D-pad Up/Down: Adjust max speed")
+    console.print("  X: Emergency stop")
+    console.print("  Circle: Quit\n")
+
+    quit_event = asyncio.Event()
+
+    with StatusDisplay() as display, ControllerReader(joystick) as controller:
+        # BLE writes run in their own task so a slow write can't stall polling
+        commands = asyncio.Queue(maxsize=1)
+        async with asyncio.TaskGroup() as tg:
+            writer = tg.create_task(ble.send_commands(client, commands))
+            tg.create_task(poll_controller(controller, commands, display, quit_event))
+
+            await quit_event.wait()
+
+            # Stop the car before disconnecting, but don't hang on it
+            ble.queue_command(commands, ble.STOP_COMMAND, response=True)
+            try:
+                await asyncio.wait_for(commands.join(), timeout=ble.SHUTDOWN_TIMEOUT)
+            except TimeoutError:
+                display.print("[yellow]Stop command was not acknowledged in time[/yellow]")
+            writer.cancel()
+
+async def main():
+    # Initialize pygame and joystick
+    pygame.init()
+    pygame.joystick.init()
+
+    # Check for controllers
+    joystick_count = pygame.joystick.get_count()
+    if joystick_count == 0:
+        console.print("[red]No controllers detected![/red]")
+        console.print("Make sure your DualSense controller is connected.")
+        sys.exit(1)
+
+    # Get first controller
+    joystick = pygame.joystick.Joystick(0)
+    joystick.init()
+    console.print(f"[green]Controller:[/green] {joystick.get_name()}\n")
+
+    try:
+        await ble.drive(lambda client: control_loop(client, joystick))
+    except Exception as e:
+        print_error(e)
+    finally:
+        pygame.quit()
+        console.print("[green]Disconnected. Goodbye![/green]")
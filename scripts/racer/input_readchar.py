@@ -0,0 +1,101 @@
+"""
+Terminal keyboard input for the car, read with readchar.
+
+Works without a window or root access; each key press sends one timed
+command. W=Forward, S=Backward, A=Left, D=Right, Q=Quit.
+"""
+import asyncio
+import contextlib
+import sys
+import threading
+import readchar
+
+from racer import ble
+from racer.console import console, print_error
+
+
+def start_key_reader(keys):
+    """
+    Forward keystrokes to the queue from a daemon thread until 'q' is pressed.
+
+    A readkey still blocked when the car link fails can't keep the process
+    alive, unlike one running in the default executor.
+    """
+    loop = asyncio.get_running_loop()
+
+    def read_keys():
+        while True:
+            try:
+                key = readchar.readkey()
+            except KeyboardInterrupt as e:
+                # Ctrl+C in raw mode; send_keys raises it on the event loop
+                key = e
+            try:
+                loop.call_soon_threadsafe(ble.put_latest, keys, key)
+            except RuntimeError:
+                return  # Event loop already closed
+            if key == 'q' or isinstance(key, KeyboardInterrupt):
+                return
+
+    threading.Thread(target=read_keys, daemon=True).start()
+
+@contextlib.contextmanager
+def restore_terminal():
+    """Restore the terminal mode on exit, which a readkey cut short leaves raw."""
+    try:
+        import termios
+    except ImportError:  # Windows, readchar doesn't change the console mode there
+        yield
+        return
+    try:
+        settings = termios.tcgetattr(sys.stdin)
+    except termios.error:  # stdin isn't a terminal
+        yield
+        return
+    try:
+        yield
+    finally:
+        termios.tcsetattr(sys.stdin, termios.TCSADRAIN, settings)
+
+async def send_keys(client, keys):
+    """Send the command for the latest key, at most once per connection interval"""
+    while True:
+        key = await keys.get()
+
+        if isinstance(key, KeyboardInterrupt):
+            raise key
+        elif key == 'q':
+            console.print("\n[red]Quitting...[/red]")
+            return
+        elif key == 'w':
+            await ble.send_command(client, 60, 1, 60, 1, 5)
+            console.print("⬆️  [cyan]Forward[/cyan]")
+        elif key == 's':
+            await ble.send_command(client, 50, 0, 50, 0, 5)
+            console.print("⬇️  [yellow]Backward[/yellow]")
+        elif key == 'a':
+            await ble.send_command(client, 40, 0, 40, 1, 3)
+            console.print("⬅️  [magenta]Left[/magenta]")
+        elif key == 'd':
+            await ble.send_command(client, 40, 1, 40, 0, 3)
+            console.print("➡️  [blue]Right[/blue]")
+        else:
+            continue
+
+        # Keys arriving meanwhile replace each other in the queue
+        await asyncio.sleep(ble.SEND_INTERVAL)
+
+async def control_loop(client):
+    console.print("[bold]Controls: W=Forward, S=Backward, A=Left, D=Right, Q=Quit[/bold]\n")
+
+    # Only the latest key is kept, so autorepeat can't queue up stale commands
+    keys = asyncio.Queue(maxsize=1)
+    start_key_reader(keys)
+    await send_keys(client, keys)
+
+async def main():
+    with restore_terminal():
+        try:
+            await ble.drive(control_loop, confirm_saved=True)
+        except Exception as e:
+            print_error(e)